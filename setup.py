@@ -0,0 +1,19 @@
+from setuptools import Extension, setup
+
+# The extension is an optional fast path: so_function_lister_elf falls back
+# to the pure-Python scan when it is not built.
+#
+#     python setup.py build_ext --inplace
+
+setup(
+    name='so-function-lister',
+    version='0.1.0',
+    py_modules=['so_function_lister', 'so_function_lister_elf'],
+    ext_modules=[
+        Extension(
+            '_symscan',
+            sources=['_symscan.c'],
+            extra_compile_args=['-O3'],
+        ),
+    ],
+)
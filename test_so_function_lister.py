@@ -36,7 +36,7 @@ class TestNMVersion(unittest.TestCase):
         if not os.path.exists(TEST_LIBRARY):
             self.skipTest(f"{TEST_LIBRARY} not found")
         
-        functions = nm_version.list_functions(TEST_LIBRARY)
+        functions = nm_version.list_functions(TEST_LIBRARY, use_nm=True)
         self.assertIsNotNone(functions, f"Failed to list functions from {TEST_LIBRARY}")
         self.assertGreater(len(functions), 0, f"No functions found in {TEST_LIBRARY}")
         
@@ -49,7 +49,7 @@ class TestNMVersion(unittest.TestCase):
     
     def test_nonexistent_file(self):
         """Test that None is returned for non-existent files."""
-        result = nm_version.list_functions('/nonexistent/path/to/file.so')
+        result = nm_version.list_functions('/nonexistent/path/to/file.so', use_nm=True)
         self.assertIsNone(result)
     
     def test_invalid_file(self):
@@ -59,7 +59,7 @@ class TestNMVersion(unittest.TestCase):
             temp_file = f.name
         
         try:
-            result = nm_version.list_functions(temp_file)
+            result = nm_version.list_functions(temp_file, use_nm=True)
             self.assertIsNone(result)
         finally:
             os.unlink(temp_file)
@@ -85,9 +85,19 @@ class TestNMVersion(unittest.TestCase):
             capture_output=True,
             text=True
         )
-        
+
         self.assertNotEqual(result.returncode, 0)
 
+    def test_many(self):
+        """Test the parallel multi-library API."""
+        if not os.path.exists(TEST_LIBRARY):
+            self.skipTest(f"{TEST_LIBRARY} not found")
+
+        results = nm_version.list_functions_many([TEST_LIBRARY, TEST_LIBRARY], use_nm=True)
+        self.assertEqual(set(results), {TEST_LIBRARY})
+        self.assertEqual(results[TEST_LIBRARY],
+                         nm_version.list_functions(TEST_LIBRARY, use_nm=True))
+
 
 class TestELFVersion(unittest.TestCase):
     """Test cases for ELF-parsing function lister."""
@@ -149,6 +159,16 @@ class TestELFVersion(unittest.TestCase):
         
         self.assertNotEqual(result.returncode, 0)
 
+    def test_many(self):
+        """Test the parallel multi-library API."""
+        if not os.path.exists(TEST_LIBRARY):
+            self.skipTest(f"{TEST_LIBRARY} not found")
+
+        results = elf_version.list_functions_many([TEST_LIBRARY, '/nonexistent/file.so'])
+        self.assertEqual(results[TEST_LIBRARY],
+                         elf_version.list_functions(TEST_LIBRARY))
+        self.assertIsNone(results['/nonexistent/file.so'])
+
 
 class TestBothVersions(unittest.TestCase):
     """Compare both implementations to ensure they produce the same results."""
@@ -158,7 +178,7 @@ class TestBothVersions(unittest.TestCase):
         if not os.path.exists(TEST_LIBRARY):
             self.skipTest(f"{TEST_LIBRARY} not found")
         
-        nm_functions = nm_version.list_functions(TEST_LIBRARY)
+        nm_functions = nm_version.list_functions(TEST_LIBRARY, use_nm=True)
         elf_functions = elf_version.list_functions(TEST_LIBRARY)
         
         self.assertIsNotNone(nm_functions)